@@ -0,0 +1,139 @@
+"""
+Server-side micro-batching for single-sentence requests.
+
+Concurrent POST /predict calls are queued and drained by one background task,
+which groups up to `max_batch_size` sentences (waiting at most `max_wait_ms`
+for the batch to fill) into a single forward pass. Inference runs in a worker
+thread so the event loop keeps accepting requests while the model is busy.
+Sentences already in the model's prediction cache are answered without it.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+# Called through the module (not imported by name) so patches on app.model
+# apply regardless of import order.
+from app import model
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects queued sentences into batches and resolves one future per request."""
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Items taken off the queue but not yet resolved, so stop() can fail them
+        self._inflight: list[tuple[str, asyncio.Future]] = []
+
+    async def start(self) -> None:
+        """Start the background batching task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    async def stop(self) -> None:
+        """Cancel the background task; pending requests fail with RuntimeError."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        pending = self._inflight
+        self._inflight = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, fut in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("Service is shutting down."))
+
+    async def submit(self, sentence: str) -> dict:
+        """Queue a sentence and wait for its {"label", "score"} prediction."""
+        if self._task is None:
+            raise RuntimeError("Micro-batcher is not running.")
+
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((sentence, fut))
+        return await fut
+
+    async def _collect(self) -> list[tuple[str, asyncio.Future]]:
+        """Block for the first item, then gather more until full or timed out."""
+        loop = asyncio.get_running_loop()
+        batch = self._inflight = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+
+            # Answer cache hits straight away; only misses reach the model.
+            misses = []
+            for sentence, fut in batch:
+                hit = model.cached_prediction(sentence)
+                if hit is None:
+                    misses.append((sentence, fut))
+                elif not fut.done():
+                    fut.set_result(hit)
+
+            results = await self._predict([sentence for sentence, _ in misses]) if misses else []
+
+            logger.debug(
+                f"Micro-batch of {len(batch)} sentences completed "
+                f"({len(batch) - len(misses)} cache hits)"
+            )
+            for (_, fut), result in zip(misses, results):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+            self._inflight = []
+
+    async def _predict(self, sentences: list[str]) -> list:
+        """Return one prediction dict or exception per sentence, in order."""
+        if len(sentences) == 1:
+            # Nothing to batch with — predict_single memoises its own result.
+            return [await self._predict_one(sentences[0])]
+
+        try:
+            results = await asyncio.to_thread(model.predict_batch, sentences)
+        except Exception:
+            # One bad sentence must not fail its neighbours: retry individually.
+            logger.exception(
+                f"Micro-batch of {len(sentences)} sentences failed; retrying one at a time"
+            )
+            return [await self._predict_one(sentence) for sentence in sentences]
+
+        preds = [{"label": r["label"], "score": r["score"]} for r in results]
+        for sentence, pred in zip(sentences, preds):
+            model.cache_prediction(sentence, pred)
+        return preds
+
+    async def _predict_one(self, sentence: str):
+        try:
+            result = await asyncio.to_thread(model.predict_single, sentence)
+        except Exception as exc:
+            return exc
+        return {"label": result["label"], "score": result["score"]}
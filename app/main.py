@@ -15,15 +15,26 @@ Endpoints:
   POST /predict/batch    - batch classification (up to 64 sentences)
 """
 
+import asyncio
 import logging
+import os
 import time
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.model import get_model_info, load_model, predict_batch, predict_single
+from app.batching import MicroBatcher
+from app.model import (
+    MODEL_NAME,
+    configure_threads,
+    get_model_info,
+    load_model,
+    predict_batch,
+)
 from app.schemas import (
     BatchPredictItem,
     BatchPredictRequest,
@@ -44,17 +55,33 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------------
+# Micro-batching — concurrent /predict calls share one forward pass
+# ---------------------------------------------------------------------------
+batcher = MicroBatcher(
+    max_batch_size=int(os.getenv("MICRO_BATCH_SIZE", "32")),
+    max_wait_ms=float(os.getenv("MICRO_BATCH_WAIT_MS", "5")),
+)
+
+
 # ---------------------------------------------------------------------------
 # Lifespan — load model once at startup
 # ---------------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load the ML model before serving any requests."""
+    """Load the ML model before serving any requests.
+
+    Runs once in every Uvicorn worker process, so each worker sizes its own
+    thread pool and holds its own copy of the model.
+    """
     logger.info("=== Application startup: loading Clinical BERT model ===")
+    configure_threads()
     load_model()
+    await batcher.start()
     logger.info("=== Model ready — API is live ===")
     yield
     logger.info("=== Application shutdown ===")
+    await batcher.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -64,10 +91,11 @@ app = FastAPI(
     title="Clinical BERT Assertion API",
     description=(
         "Real-time inference API for clinical assertion/negation classification "
-        "using the bvanaken/clinical-assertion-negation-bert HuggingFace model."
+        f"using the {MODEL_NAME} HuggingFace model."
     ),
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -80,6 +108,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger bodies (mainly /predict/batch); small responses skip it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # ---------------------------------------------------------------------------
 # Request timing middleware
@@ -99,7 +130,7 @@ async def add_process_time_header(request: Request, call_next):
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     logger.exception(f"Unhandled error on {request.method} {request.url.path}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error. Please try again later."},
     )
@@ -108,20 +139,29 @@ async def generic_exception_handler(request: Request, exc: Exception):
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
+API_INFO = {
+    "name": "Clinical BERT Assertion API",
+    "version": "1.0.0",
+    "model": MODEL_NAME,
+    "endpoints": {
+        "health": "GET /health",
+        "predict": "POST /predict",
+        "batch_predict": "POST /predict/batch",
+        "docs": "GET /docs",
+    },
+}
+
+# /health is hit by liveness/readiness probes every few seconds. A successful
+# payload is reused for HEALTH_CACHE_TTL_S instead of being rebuilt per probe.
+HEALTH_CACHE_TTL_S = 1.0
+_health_cache: Optional[tuple[float, HealthResponse]] = None
+
+
 @app.get("/", summary="API info", tags=["Meta"])
-async def root():
+async def root(response: Response):
     """Return basic API metadata."""
-    return {
-        "name": "Clinical BERT Assertion API",
-        "version": "1.0.0",
-        "model": "bvanaken/clinical-assertion-negation-bert",
-        "endpoints": {
-            "health": "GET /health",
-            "predict": "POST /predict",
-            "batch_predict": "POST /predict/batch",
-            "docs": "GET /docs",
-        },
-    }
+    response.headers["Cache-Control"] = "max-age=300"
+    return API_INFO
 
 
 @app.get(
@@ -130,24 +170,34 @@ async def root():
     summary="Health / readiness check",
     tags=["Meta"],
 )
-async def health():
+async def health(response: Response):
     """
     Liveness and readiness probe.
     Returns HTTP 200 when the model is loaded and ready to serve requests.
     Returns HTTP 503 if the model failed to load.
     """
-    info = get_model_info()
-    if not info["loaded"]:
-        raise HTTPException(
-            status_code=503,
-            detail="Model is not yet loaded. Service is not ready.",
+    global _health_cache
+
+    now = time.monotonic()
+    if _health_cache is None or now - _health_cache[0] >= HEALTH_CACHE_TTL_S:
+        info = get_model_info()
+        if not info["loaded"]:
+            raise HTTPException(
+                status_code=503,
+                detail="Model is not yet loaded. Service is not ready.",
+            )
+        _health_cache = (
+            now,
+            HealthResponse(
+                status="ok",
+                model_name=info["model_name"],
+                model_loaded=info["loaded"],
+                device=info["device"],
+            ),
         )
-    return HealthResponse(
-        status="ok",
-        model_name=info["model_name"],
-        model_loaded=info["loaded"],
-        device=info["device"],
-    )
+
+    response.headers["Cache-Control"] = "max-age=5"
+    return _health_cache[1]
 
 
 @app.post(
@@ -166,9 +216,11 @@ async def predict(request: PredictRequest):
     - `CONDITIONAL` - the concept is hypothetical (e.g. *"If dizziness occurs, reduce dose."*)
 
     **Performance target:** < 500 ms for short clinical sentences on CPU.
+
+    Concurrent requests are micro-batched into a single forward pass.
     """
     try:
-        result = predict_single(request.sentence)
+        result = await batcher.submit(request.sentence)
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
@@ -181,6 +233,7 @@ async def predict(request: PredictRequest):
 @app.post(
     "/predict/batch",
     response_model=BatchPredictResponse,
+    response_model_exclude_none=True,
     summary="Classify multiple clinical sentences in one request",
     tags=["Inference"],
 )
@@ -189,15 +242,19 @@ async def predict_batch_endpoint(request: BatchPredictRequest):
     Classify the assertion status of up to **64** clinical sentences in a single
     request. Sentences are processed in one batched forward-pass for efficiency.
 
-    Returns a list of results preserving input order.
+    Returns a list of results preserving input order. Set `echo_input` to
+    include each input sentence alongside its result.
     """
     try:
-        results = predict_batch(request.sentences)
+        results = await asyncio.to_thread(predict_batch, request.sentences)
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
         logger.exception("Batch prediction error")
         raise HTTPException(status_code=500, detail="Batch prediction failed.") from exc
 
-    items = [BatchPredictItem(**r) for r in results]
+    if request.echo_input:
+        items = [BatchPredictItem(**r) for r in results]
+    else:
+        items = [BatchPredictItem(label=r["label"], score=r["score"]) for r in results]
     return BatchPredictResponse(results=items, count=len(items))
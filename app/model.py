@@ -4,19 +4,101 @@ The model is loaded once at startup and cached for all subsequent requests.
 """
 
 import logging
+import os
+import threading
 import time
+from collections import OrderedDict
+from contextlib import nullcontext
 from typing import Optional
 
+import numpy as np
 import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
 
 logger = logging.getLogger(__name__)
 
-MODEL_NAME = "bvanaken/clinical-assertion-negation-bert"
+# HF model id or local checkpoint, e.g. the 6-layer student written by
+# scripts/distill.py. Defaults to the full 12-layer teacher for accuracy.
+MODEL_NAME = os.getenv("MODEL_NAME", "bvanaken/clinical-assertion-negation-bert")
+
+# INT8 dynamic quantization of the Linear layers (CPU only). Set QUANTIZE=0 to
+# serve the original FP32 weights.
+QUANTIZE = os.getenv("QUANTIZE", "1") == "1"
+
+# Optional ONNX Runtime backend. Point this at a graph produced by
+# scripts/export_onnx.py (model.int8.onnx or the FP32 model.onnx) to serve
+# through ORT instead of PyTorch.
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH")
+# Execution provider for the ONNX backend: TensorRT (USE_TRT=1, needs a CUDA
+# GPU and onnxruntime-gpu) or OpenVINO (USE_OPENVINO=1, needs
+# onnxruntime-openvino). Falls back to the default CPU provider.
+USE_TRT = os.getenv("USE_TRT", "0") == "1"
+USE_OPENVINO = os.getenv("USE_OPENVINO", "0") == "1"
+TRT_ENGINE_CACHE_PATH = os.getenv("TRT_ENGINE_CACHE_PATH", "/tmp/trt_cache")
+
+# Clinical assertion sentences rarely exceed ~50 tokens; attention cost is
+# quadratic in sequence length, so cap well below BERT's 512 limit.
+MAX_LENGTH = int(os.getenv("MAX_LENGTH", "128"))
+BATCH_SIZE = 16
+
+# Intra-op threads per worker process. Keep (uvicorn workers x INFERENCE_THREADS)
+# at or below the number of physical cores to avoid oversubscription.
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Intel Extension for PyTorch (USE_IPEX=1): fused oneDNN kernels with BF16
+# autocast, which maps onto AMX/AVX-512 on Ice Lake and newer Xeons. Replaces
+# dynamic INT8 quantization when enabled. Requires intel-extension-for-pytorch.
+USE_IPEX = os.getenv("USE_IPEX", "0") == "1"
+
+# Compile the PyTorch model with torch.compile at startup (TORCH_COMPILE=1).
+# Off by default: compilation adds tens of seconds to cold start.
+TORCH_COMPILE = os.getenv("TORCH_COMPILE", "0") == "1"
+COMPILE_WARMUP_LENGTHS = (32, 64, 128)
+
+# Dummy inputs run once at startup so tokenizer caches and kernel/graph
+# selection are paid before the first real request.
+WARMUP_TEXTS = ("ok", "The patient has fever.", "word " * 60)
+
+# Max distinct sentences memoised across predict_single and the micro-batcher
+# (0 disables the cache).
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "4096"))
+
+# CUDA availability is queried once at import; get_model_info() sits on the
+# /health hot path and must not re-probe the driver on every call.
+_CUDA_AVAILABLE: bool = torch.cuda.is_available()
+_DEVICE_NAME = "GPU (CUDA)" if _CUDA_AVAILABLE else "CPU"
 
 # Module-level singletons — loaded once at startup
-_pipeline: Optional[object] = None
+_model: Optional[torch.nn.Module] = None
+_session: Optional[object] = None
+_tokenizer: Optional[object] = None
+_device: torch.device = torch.device("cuda" if _CUDA_AVAILABLE else "cpu")
+_labels: tuple[str, ...] = ()  # label names indexed by logit position
 _load_time_ms: Optional[float] = None
+_warmup_ms: Optional[float] = None
+_quantized: bool = False
+_bf16: bool = False
+
+# LRU of normalised sentence -> (label, score). Inference runs in worker
+# threads, so every access goes through the lock.
+_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Serialises tokenize + forward. The fast tokenizer is not thread-safe
+# ("Already borrowed" when padding settings race), and concurrent forward
+# passes would each claim INFERENCE_THREADS intra-op threads.
+_inference_lock = threading.Lock()
+
+
+def configure_threads() -> None:
+    """Pin PyTorch's intra-op pool to INFERENCE_THREADS and use one inter-op thread."""
+    torch.set_num_threads(INFERENCE_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before any inter-op work has started in this process.
+        logger.warning("Inter-op thread pool already initialised — leaving as is.")
+    logger.info(f"Inference threads: intra-op={INFERENCE_THREADS}, inter-op=1")
 
 
 def load_model() -> None:
@@ -24,110 +106,383 @@ def load_model() -> None:
     Load the HuggingFace model and tokenizer, storing them as module-level singletons.
     Should be called exactly once during application startup (via FastAPI lifespan).
     """
-    global _pipeline, _load_time_ms
+    global _load_time_ms
 
-    if _pipeline is not None:
+    if _model is not None or _session is not None:
         logger.info("Model already loaded — skipping reload.")
         return
 
     logger.info(f"Loading model: {MODEL_NAME} …")
     start = time.perf_counter()
 
-    device = 0 if torch.cuda.is_available() else -1
-    device_name = "GPU (CUDA)" if device == 0 else "CPU"
-    logger.info(f"Running inference on: {device_name}")
+    logger.info(f"Running inference on: {_DEVICE_NAME}")
 
     tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
 
-    _pipeline = pipeline(
-        task="text-classification",
-        model=model,
-        tokenizer=tokenizer,
-        device=device,
-        top_k=None,  # return scores for ALL labels
-        truncation=True,
-        max_length=512,
-    )
+    if ONNX_MODEL_PATH:
+        _load_onnx_session(tokenizer)
+    else:
+        _load_torch_model(tokenizer)
 
     elapsed = (time.perf_counter() - start) * 1000
     _load_time_ms = elapsed
     logger.info(f"Model loaded in {elapsed:.1f} ms")
 
+    _warmup()
+
+
+def _load_torch_model(tokenizer) -> None:
+    """Load the PyTorch classifier and apply the configured CPU/GPU optimisations."""
+    global _model, _tokenizer, _labels, _quantized, _bf16
+
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+
+    if USE_IPEX and _device.type == "cpu":
+        import intel_extension_for_pytorch as ipex
+
+        model = ipex.optimize(model, dtype=torch.bfloat16)
+        _bf16 = True
+        logger.info("Optimised model with IPEX (bfloat16)")
+    # Dynamic quantization only has CPU kernels — GPU deployments keep FP32.
+    elif QUANTIZE and _device.type == "cpu":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        _quantized = True
+        logger.info("Applied INT8 dynamic quantization to Linear layers")
+
+    model = model.to(_device)
+    _labels = _label_names(model.config)
+
+    if TORCH_COMPILE:
+        # Compilation is lazy, so backend failures (e.g. inductor without a C++
+        # toolchain) only surface in the warmup; serve the eager model instead.
+        try:
+            compiled = torch.compile(model, mode="reduce-overhead", dynamic=True)
+            _warmup_compiled(compiled, tokenizer)
+        except Exception:
+            logger.exception("torch.compile failed — continuing with the eager model.")
+        else:
+            model = compiled
+
+    _model = model
+    _tokenizer = tokenizer
+
+
+def _warmup() -> None:
+    """
+    Run WARMUP_TEXTS through the inference path, singly and as one batch.
+    Bypasses the predict_single cache; failures are logged, never raised.
+    """
+    global _warmup_ms
+
+    start = time.perf_counter()
+    try:
+        for text in WARMUP_TEXTS:
+            if _session is not None:
+                _predict_onnx([text])
+            else:
+                _predict_torch([text], padding=False)
+        if _session is not None:
+            _predict_onnx(list(WARMUP_TEXTS))
+        else:
+            _predict_torch(list(WARMUP_TEXTS), padding="longest")
+    except Exception:
+        logger.exception("Warmup failed — continuing startup without it.")
+        return
+
+    _warmup_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Warmup completed in {_warmup_ms:.1f} ms")
+
+
+def _label_names(config) -> tuple[str, ...]:
+    """Flatten config.id2label into a tuple so argmax indices map by position."""
+    return tuple(config.id2label[i] for i in range(config.num_labels))
+
+
+def _autocast():
+    """BF16 autocast context for the IPEX path; a no-op otherwise."""
+    return torch.autocast("cpu", dtype=torch.bfloat16) if _bf16 else nullcontext()
+
+
+def _warmup_compiled(model, tokenizer) -> None:
+    """Trigger compilation at representative sequence lengths before serving."""
+    for length in COMPILE_WARMUP_LENGTHS:
+        length = min(length, MAX_LENGTH)
+        enc = tokenizer(
+            "warmup " * length,
+            return_tensors="pt",
+            truncation=True,
+            max_length=length,
+        ).to(_device)
+        start = time.perf_counter()
+        with torch.inference_mode(), _autocast():
+            model(**enc)
+        logger.info(
+            f"torch.compile warmup at {length} tokens: "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+
+def _onnx_providers(available: list[str]) -> list:
+    """Pick ORT execution providers from USE_TRT / USE_OPENVINO, CPU always last."""
+    if USE_TRT and not _CUDA_AVAILABLE:
+        logger.warning("USE_TRT is set but no CUDA device is available — ignoring it.")
+
+    if USE_TRT and _CUDA_AVAILABLE:
+        # Build TRT engines once and reuse them across restarts. TRT INT8 needs a
+        # QDQ (static) graph; with the dynamic-INT8 export TRT runs in FP16.
+        requested = [
+            (
+                "TensorrtExecutionProvider",
+                {
+                    "trt_fp16_enable": True,
+                    "trt_engine_cache_enable": True,
+                    "trt_engine_cache_path": TRT_ENGINE_CACHE_PATH,
+                },
+            ),
+            "CUDAExecutionProvider",
+        ]
+    elif USE_OPENVINO:
+        requested = [("OpenVINOExecutionProvider", {"device_type": "CPU"})]
+    else:
+        requested = []
+
+    providers = []
+    for provider in requested:
+        name = provider[0] if isinstance(provider, tuple) else provider
+        if name in available:
+            providers.append(provider)
+        else:
+            logger.warning(f"{name} is not available in this onnxruntime build — skipping.")
+    # Nodes the accelerated providers cannot handle fall back to CPU.
+    providers.append("CPUExecutionProvider")
+    return providers
+
+
+def _load_onnx_session(tokenizer) -> None:
+    """Create the ONNX Runtime session for ONNX_MODEL_PATH."""
+    global _session, _tokenizer, _labels, _quantized
 
-def get_pipeline():
-    """Return the cached inference pipeline (raises if not loaded)."""
-    if _pipeline is None:
+    import onnxruntime as ort
+
+    logger.info(f"Loading ONNX graph: {ONNX_MODEL_PATH}")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = INFERENCE_THREADS
+    options.inter_op_num_threads = 1
+
+    _session = ort.InferenceSession(
+        ONNX_MODEL_PATH,
+        sess_options=options,
+        providers=_onnx_providers(ort.get_available_providers()),
+    )
+    logger.info(f"ONNX Runtime providers: {_session.get_providers()}")
+    _tokenizer = tokenizer
+    _labels = _label_names(AutoConfig.from_pretrained(_onnx_config_dir()))
+    _quantized = _onnx_is_quantized(ONNX_MODEL_PATH)
+
+
+def _onnx_config_dir() -> str:
+    """
+    Where to read id2label for the ONNX graph: the config.json that
+    export_onnx.py writes next to it, else MODEL_NAME (which must then be the
+    checkpoint the graph was exported from).
+    """
+    graph_dir = os.path.dirname(os.path.abspath(ONNX_MODEL_PATH))
+    if os.path.isfile(os.path.join(graph_dir, "config.json")):
+        return graph_dir
+    logger.warning(
+        f"No config.json next to {ONNX_MODEL_PATH} — reading labels from {MODEL_NAME}, "
+        "which must match the exported model."
+    )
+    return MODEL_NAME
+
+
+# Ops emitted by onnxruntime.quantization (dynamic and static) for INT8 graphs.
+_ONNX_INT8_OPS = {"DynamicQuantizeLinear", "MatMulInteger", "QLinearMatMul", "QuantizeLinear"}
+
+
+def _onnx_is_quantized(path: str) -> bool:
+    """True if the graph at `path` contains INT8 quantization ops."""
+    import onnx
+
+    graph = onnx.load(path, load_external_data=False).graph
+    return any(node.op_type in _ONNX_INT8_OPS for node in graph.node)
+
+
+def _predict_onnx(sentences: list[str]) -> list[dict]:
+    """Tokenize, run the ORT session and reduce logits to {label, score}."""
+    enc = _tokenizer(
+        sentences,
+        return_tensors="np",
+        padding="longest",
+        truncation=True,
+        max_length=MAX_LENGTH,
+    )
+    feed = {i.name: enc[i.name] for i in _session.get_inputs()}
+    logits: np.ndarray = _session.run(None, feed)[0]
+
+    # Numerically stable softmax over the label axis
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    probs = exp / exp.sum(axis=-1, keepdims=True)
+    idx = probs.argmax(axis=-1)
+    # Round in float64 so tolist() yields exactly the 4-decimal values.
+    scores = np.round(probs[np.arange(len(idx)), idx].astype(np.float64), 4)
+
+    return [{"label": _labels[i], "score": s} for i, s in zip(idx.tolist(), scores.tolist())]
+
+
+def get_model():
+    """Return the cached (model, tokenizer) pair (raises if not loaded)."""
+    if _model is None:
         raise RuntimeError(
-            "Model pipeline is not initialised. "
+            "Model is not initialised. "
             "Ensure load_model() was called during application startup."
         )
-    return _pipeline
+    return _model, _tokenizer
+
+
+def _predict_torch(sentences: list[str], padding: bool | str) -> list[dict]:
+    """Tokenize, run a single forward pass and reduce logits to {label, score}."""
+    model, tokenizer = get_model()
+
+    enc = tokenizer(
+        sentences,
+        return_tensors="pt",
+        padding=padding,
+        truncation=True,
+        max_length=MAX_LENGTH,
+    ).to(_device)
+
+    with torch.inference_mode(), _autocast():
+        logits = model(**enc).logits
+
+    # One softmax + one max over the whole batch; the label lookup is a tuple index.
+    scores, idx = torch.softmax(logits.float(), dim=-1).max(dim=-1)
+    # Round in float64 so tolist() yields exactly the 4-decimal values.
+    scores = (scores.double() * 1e4).round() / 1e4
+
+    return [{"label": _labels[i], "score": s} for i, s in zip(idx.tolist(), scores.tolist())]
+
+
+def _cache_key(sentence: str) -> str:
+    # Collapsing runs of whitespace does not change BERT's tokenization but
+    # lets trivially different inputs share a cache entry.
+    return " ".join(sentence.split())
+
+
+def cached_prediction(sentence: str) -> Optional[dict]:
+    """Return the memoised {"label", "score"} for a sentence, or None on a miss."""
+    key = _cache_key(sentence)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is None:
+            return None
+        _cache.move_to_end(key)
+    return {"label": hit[0], "score": hit[1]}
+
+
+def cache_prediction(sentence: str, prediction: dict) -> None:
+    """Memoise a prediction, evicting the least recently used beyond CACHE_SIZE."""
+    if CACHE_SIZE <= 0:
+        return
+    key = _cache_key(sentence)
+    with _cache_lock:
+        _cache[key] = (prediction["label"], prediction["score"])
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    """Drop every memoised prediction."""
+    with _cache_lock:
+        _cache.clear()
 
 
 def predict_single(sentence: str) -> dict:
     """
     Run inference on a single sentence.
 
+    Results are memoised in an LRU cache of CACHE_SIZE entries, so repeated
+    sentences skip the forward pass entirely.
+
     Returns:
         {"label": str, "score": float}
         where label is one of PRESENT | ABSENT | CONDITIONAL
         and score is the confidence for that label (0-1).
     """
-    pipe = get_pipeline()
+    key = _cache_key(sentence)
 
     start = time.perf_counter()
-    raw: list[list[dict]] = pipe(sentence)
+    result = cached_prediction(key)
+    if result is None:
+        with _inference_lock:
+            if _session is not None:
+                pred = _predict_onnx([key])[0]
+            else:
+                # A batch of one never needs padding.
+                pred = _predict_torch([key], padding=False)[0]
+        result = {"label": pred["label"], "score": pred["score"]}
+        cache_prediction(key, result)
     latency_ms = (time.perf_counter() - start) * 1000
 
-    # pipeline with top_k=None returns [[{label, score}, …]]
-    all_scores: list[dict] = raw[0]
-    best = max(all_scores, key=lambda x: x["score"])
-
     logger.debug(
-        f"Prediction: label={best['label']!r} score={best['score']:.4f} "
+        f"Prediction: label={result['label']!r} score={result['score']:.4f} "
         f"latency={latency_ms:.1f}ms"
     )
 
-    return {"label": best["label"], "score": round(best["score"], 4)}
+    return result
 
 
 def predict_batch(sentences: list[str]) -> list[dict]:
     """
-    Run inference on a list of sentences efficiently using the pipeline's
-    built-in batching.
+    Run inference on a list of sentences in mini-batches of BATCH_SIZE.
+
+    Sentences are sorted by token length before batching so each mini-batch
+    pads to a similar length, then results are scattered back to input order.
 
     Returns:
         List of {"label": str, "score": float, "sentence": str}
     """
-    pipe = get_pipeline()
+    if _session is None:
+        get_model()  # fail fast with RuntimeError if not loaded
 
     start = time.perf_counter()
-    raw: list[list[dict]] = pipe(sentences, batch_size=16)
-    latency_ms = (time.perf_counter() - start) * 1000
 
-    results = []
-    for sentence, all_scores in zip(sentences, raw):
-        best = max(all_scores, key=lambda x: x["score"])
-        results.append(
-            {
-                "sentence": sentence,
-                "label": best["label"],
-                "score": round(best["score"], 4),
-            }
-        )
+    preds: list[Optional[dict]] = [None] * len(sentences)
+    with _inference_lock:
+        lengths = _tokenizer(sentences, truncation=True, max_length=MAX_LENGTH, return_length=True)[
+            "length"
+        ]
+        order = np.argsort(lengths, kind="stable")
+
+        for i in range(0, len(order), BATCH_SIZE):
+            chunk = order[i : i + BATCH_SIZE]
+            chunk_sentences = [sentences[j] for j in chunk]
+            if _session is not None:
+                chunk_preds = _predict_onnx(chunk_sentences)
+            else:
+                chunk_preds = _predict_torch(chunk_sentences, padding="longest")
+            for j, pred in zip(chunk, chunk_preds):
+                preds[j] = pred
+
+    latency_ms = (time.perf_counter() - start) * 1000
 
     logger.debug(f"Batch prediction: {len(sentences)} sentences in {latency_ms:.1f}ms")
 
-    return results
+    return [{"sentence": s, **p} for s, p in zip(sentences, preds)]
 
 
 def get_model_info() -> dict:
     """Return metadata about the loaded model."""
     return {
         "model_name": MODEL_NAME,
-        "loaded": _pipeline is not None,
+        "loaded": _model is not None or _session is not None,
         "load_time_ms": round(_load_time_ms, 1) if _load_time_ms else None,
-        "device": ("GPU (CUDA)" if torch.cuda.is_available() else "CPU"),
-        "labels": ["PRESENT", "ABSENT", "CONDITIONAL"],
+        "warmup_ms": round(_warmup_ms, 1) if _warmup_ms else None,
+        "device": _DEVICE_NAME,
+        "quantized": _quantized,
+        "bf16": _bf16,
+        "labels": list(_labels),
     }
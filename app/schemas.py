@@ -2,9 +2,15 @@
 Pydantic schemas for request / response validation.
 """
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, StringConstraints
+
+# Stripped, non-empty clinical sentence. Constraints are enforced inside
+# pydantic-core, with min_length checked after whitespace is stripped.
+SentenceStr = Annotated[
+    str, StringConstraints(strip_whitespace=True, min_length=1, max_length=2048)
+]
 
 # ---------------------------------------------------------------------------
 # Single prediction
@@ -15,22 +21,13 @@ class PredictRequest(BaseModel):
     """Input schema for POST /predict"""
 
     sentence: Annotated[
-        str,
+        SentenceStr,
         Field(
-            min_length=1,
-            max_length=2048,
             description="Clinical sentence to classify.",
             examples=["The patient denies chest pain."],
         ),
     ]
 
-    @field_validator("sentence")
-    @classmethod
-    def sentence_must_not_be_blank(cls, v: str) -> str:
-        if not v.strip():
-            raise ValueError("sentence must not be blank or whitespace only.")
-        return v.strip()
-
 
 class PredictResponse(BaseModel):
     """Output schema for POST /predict"""
@@ -62,29 +59,25 @@ class BatchPredictRequest(BaseModel):
     """Input schema for POST /predict/batch"""
 
     sentences: Annotated[
-        list[str],
+        list[SentenceStr],
         Field(
             min_length=1,
             max_length=64,
             description="List of clinical sentences (1-64 items).",
         ),
     ]
-
-    @field_validator("sentences")
-    @classmethod
-    def validate_sentences(cls, v: list[str]) -> list[str]:
-        cleaned = []
-        for i, s in enumerate(v):
-            if not isinstance(s, str) or not s.strip():
-                raise ValueError(f"sentences[{i}] is empty or not a string.")
-            cleaned.append(s.strip())
-        return cleaned
+    echo_input: bool = Field(
+        default=False,
+        description="Include each input sentence in its result item.",
+    )
 
 
 class BatchPredictItem(BaseModel):
     """Single item in the batch response."""
 
-    sentence: str
+    sentence: Optional[str] = Field(
+        default=None, description="Input sentence; only present when echo_input is true."
+    )
     label: str
     score: float = Field(ge=0.0, le=1.0)
 
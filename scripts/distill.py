@@ -0,0 +1,166 @@
+"""
+Distil the 12-layer Clinical BERT teacher into a 6-layer student.
+
+The student is initialised DistilBERT-style from every other teacher layer,
+then trained on a soft-target (KL) + hard-label (CE) loss. Run once offline
+(needs `pip install accelerate`, which the serving image does not ship):
+    python scripts/distill.py --train-file data/assertions.csv \\
+        --output-dir models/clinical-assertion-distilled
+    MODEL_NAME=models/clinical-assertion-distilled uvicorn app.main:app
+
+The CSV needs `sentence` and `label` columns (PRESENT | ABSENT | CONDITIONAL).
+"""
+
+import argparse
+import copy
+import csv
+import logging
+from pathlib import Path
+
+import torch
+import torch.nn.functional as F
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+    Trainer,
+    TrainingArguments,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)-8s | %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEACHER = "bvanaken/clinical-assertion-negation-bert"
+
+
+class AssertionDataset(torch.utils.data.Dataset):
+    """Tokenized (sentence, label) rows from a CSV file."""
+
+    def __init__(self, path: Path, tokenizer, label2id: dict[str, int], max_length: int):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.encodings = tokenizer(
+            [r["sentence"] for r in rows], truncation=True, max_length=max_length
+        )
+        self.labels = [label2id[r["label"].strip()] for r in rows]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, i: int) -> dict:
+        item = {k: v[i] for k, v in self.encodings.items()}
+        item["labels"] = self.labels[i]
+        return item
+
+
+class DistillationTrainer(Trainer):
+    """Trainer whose loss blends KL to the teacher's soft targets with hard-label CE."""
+
+    def __init__(self, *args, teacher, temperature: float, alpha: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.teacher = teacher.to(self.args.device).eval()
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        outputs = model(**inputs)
+
+        teacher_inputs = {k: v for k, v in inputs.items() if k != "labels"}
+        with torch.no_grad():
+            teacher_logits = self.teacher(**teacher_inputs).logits
+
+        t = self.temperature
+        kd_loss = F.kl_div(
+            F.log_softmax(outputs.logits / t, dim=-1),
+            F.softmax(teacher_logits / t, dim=-1),
+            reduction="batchmean",
+        ) * (t * t)
+        loss = self.alpha * kd_loss + (1 - self.alpha) * outputs.loss
+
+        return (loss, outputs) if return_outputs else loss
+
+
+def build_student(teacher, num_layers: int):
+    """Copy the teacher with `num_layers` encoder blocks, taken at an even stride."""
+    config = copy.deepcopy(teacher.config)
+    teacher_layers = config.num_hidden_layers
+    config.num_hidden_layers = num_layers
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    # Embeddings, pooler and classifier head carry over unchanged.
+    shared = {k: v for k, v in teacher.state_dict().items() if ".encoder.layer." not in k}
+    student.load_state_dict(shared, strict=False)
+
+    stride = teacher_layers // num_layers
+    teacher_blocks = teacher.base_model.encoder.layer
+    for i, block in enumerate(student.base_model.encoder.layer):
+        block.load_state_dict(teacher_blocks[i * stride].state_dict())
+
+    return student
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teacher", default=DEFAULT_TEACHER, help="HF model id or local path.")
+    parser.add_argument("--train-file", required=True, type=Path)
+    parser.add_argument("--eval-file", type=Path)
+    parser.add_argument("--output-dir", default="models/clinical-assertion-distilled", type=Path)
+    parser.add_argument("--num-layers", default=6, type=int)
+    parser.add_argument("--epochs", default=3, type=float)
+    parser.add_argument("--batch-size", default=32, type=int)
+    parser.add_argument("--learning-rate", default=5e-5, type=float)
+    parser.add_argument("--temperature", default=2.0, type=float)
+    parser.add_argument("--alpha", default=0.5, type=float, help="Weight of the KL term.")
+    parser.add_argument("--max-length", default=128, type=int)
+    args = parser.parse_args()
+
+    logger.info(f"Loading teacher {args.teacher} …")
+    tokenizer = AutoTokenizer.from_pretrained(args.teacher)
+    teacher = AutoModelForSequenceClassification.from_pretrained(args.teacher)
+    student = build_student(teacher, args.num_layers)
+    logger.info(
+        f"Student: {args.num_layers}/{teacher.config.num_hidden_layers} layers, "
+        f"{sum(p.numel() for p in student.parameters()) / 1e6:.1f}M params"
+    )
+
+    label2id = teacher.config.label2id
+    train_ds = AssertionDataset(args.train_file, tokenizer, label2id, args.max_length)
+    eval_ds = (
+        AssertionDataset(args.eval_file, tokenizer, label2id, args.max_length)
+        if args.eval_file
+        else None
+    )
+
+    # Keep Trainer state (logs, checkpoints) beside the served model dir, not in it.
+    training_args = TrainingArguments(
+        output_dir=str(args.output_dir.with_name(f"{args.output_dir.name}-trainer")),
+        num_train_epochs=args.epochs,
+        per_device_train_batch_size=args.batch_size,
+        per_device_eval_batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        eval_strategy="epoch" if eval_ds else "no",
+        save_strategy="no",
+        logging_steps=50,
+        report_to=[],
+    )
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=train_ds,
+        eval_dataset=eval_ds,
+        data_collator=DataCollatorWithPadding(tokenizer),
+        teacher=teacher,
+        temperature=args.temperature,
+        alpha=args.alpha,
+    )
+    trainer.train()
+
+    # save_pretrained rather than trainer.save_model, which also drops
+    # training_args.bin into the directory the API loads from.
+    student.save_pretrained(args.output_dir)
+    tokenizer.save_pretrained(args.output_dir)
+    logger.info(f"Saved distilled model → {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
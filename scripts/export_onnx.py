@@ -0,0 +1,56 @@
+"""
+Export the Clinical BERT classifier to ONNX and quantize it to INT8.
+
+Run once at build time; point the API at the result with ONNX_MODEL_PATH:
+    python scripts/export_onnx.py --output-dir models/onnx
+    ONNX_MODEL_PATH=models/onnx/model.int8.onnx uvicorn app.main:app
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from transformers.onnx import FeaturesManager, export
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)-8s | %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "bvanaken/clinical-assertion-negation-bert"
+OPSET = 17
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="HF model id or local path.")
+    parser.add_argument("--output-dir", default="models/onnx", type=Path)
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    onnx_path = args.output_dir / "model.onnx"
+    quant_path = args.output_dir / "model.int8.onnx"
+
+    logger.info(f"Loading {args.model} …")
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model)
+    model.eval()
+
+    _, onnx_config_cls = FeaturesManager.check_supported_model_or_raise(
+        model, feature="sequence-classification"
+    )
+    onnx_config = onnx_config_cls(model.config)
+
+    logger.info(f"Exporting FP32 graph (opset {OPSET}) → {onnx_path}")
+    export(tokenizer, model, onnx_config, OPSET, onnx_path)
+
+    logger.info(f"Quantizing weights to INT8 → {quant_path}")
+    quantize_dynamic(onnx_path, quant_path, weight_type=QuantType.QInt8)
+
+    # The API reads id2label from this config so labels always match the graph.
+    model.config.save_pretrained(args.output_dir)
+    logger.info("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Shared pytest configuration."""
+
+import pytest
+
+import app.model as model
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "perf: latency tests against the real model (set RUN_PERF_TESTS=1)"
+    )
+
+
+@pytest.fixture
+def empty_cache():
+    """Run the test against an empty prediction cache and leave it empty."""
+    model.clear_cache()
+    yield
+    model.clear_cache()
@@ -19,8 +19,10 @@ from fastapi.testclient import TestClient
 @pytest.fixture(scope="module")
 def mock_predict_single():
     """
-    Patch app.model.predict_single and app.model.load_model so tests run
-    without downloading the full HuggingFace model (~440 MB).
+    Patch model loading and inference so tests run without downloading the
+    full HuggingFace model (~440 MB). app.main imports its model functions by
+    name, so those bindings are patched on app.main itself; the micro-batcher
+    calls through app.model and picks up the app.model patches.
     """
     label_map = {
         "The patient denies chest pain.": ("ABSENT", 0.9842),
@@ -40,22 +42,25 @@ def mock_predict_single():
         return [{"sentence": s, **_fake_predict(s)} for s in sentences]
 
     with (
-        patch("app.model.load_model"),
-        patch("app.model._pipeline", new=MagicMock()),
+        patch("app.main.load_model"),
+        patch("app.model._model", new=MagicMock()),
         patch("app.model.predict_single", side_effect=_fake_predict),
         patch("app.model.predict_batch", side_effect=_fake_batch),
+        patch("app.main.predict_batch", side_effect=_fake_batch),
         patch(
-            "app.model.get_model_info",
+            "app.main.get_model_info",
             return_value={
                 "model_name": "bvanaken/clinical-assertion-negation-bert",
                 "loaded": True,
                 "load_time_ms": 1234.5,
+                "warmup_ms": 56.7,
                 "device": "CPU",
+                "quantized": True,
+                "bf16": False,
                 "labels": ["PRESENT", "ABSENT", "CONDITIONAL"],
             },
         ),
     ):
-        # Import app AFTER patches are applied
         from app.main import app
 
         with TestClient(app) as client:
@@ -79,6 +84,10 @@ class TestHealth:
         assert "model_name" in data
         assert "device" in data
 
+    def test_health_sets_cache_control(self, mock_predict_single):
+        resp = mock_predict_single.get("/health")
+        assert resp.headers["cache-control"] == "max-age=5"
+
 
 # ---------------------------------------------------------------------------
 # Root endpoint
@@ -146,6 +155,13 @@ class TestPredict:
         resp = mock_predict_single.post("/predict", json={"sentence": "   "})
         assert resp.status_code == 422
 
+    def test_surrounding_whitespace_is_stripped(self, mock_predict_single):
+        resp = mock_predict_single.post(
+            "/predict", json={"sentence": "  The patient denies chest pain.\n"}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["label"] == "ABSENT"
+
     def test_missing_sentence_field_returns_422(self, mock_predict_single):
         resp = mock_predict_single.post("/predict", json={})
         assert resp.status_code == 422
@@ -180,16 +196,27 @@ class TestBatchPredict:
     def test_batch_results_have_correct_fields(self, mock_predict_single):
         resp = mock_predict_single.post(
             "/predict/batch",
-            json={"sentences": ["The patient denies chest pain."]},
+            json={"sentences": ["The patient denies chest pain."], "echo_input": True},
         )
         result = resp.json()["results"][0]
         assert "sentence" in result
         assert "label" in result
         assert "score" in result
 
+    def test_batch_omits_sentence_by_default(self, mock_predict_single):
+        resp = mock_predict_single.post(
+            "/predict/batch",
+            json={"sentences": ["The patient denies chest pain."]},
+        )
+        result = resp.json()["results"][0]
+        assert "sentence" not in result
+        assert result["label"] == "ABSENT"
+
     def test_batch_preserves_order(self, mock_predict_single):
         sentences = [s for s, _ in REQUIRED_CASES]
-        resp = mock_predict_single.post("/predict/batch", json={"sentences": sentences})
+        resp = mock_predict_single.post(
+            "/predict/batch", json={"sentences": sentences, "echo_input": True}
+        )
         returned_sentences = [r["sentence"] for r in resp.json()["results"]]
         assert returned_sentences == sentences
 
@@ -200,6 +227,17 @@ class TestBatchPredict:
         returned_labels = [r["label"] for r in resp.json()["results"]]
         assert returned_labels == expected_labels
 
+    def test_large_batch_response_is_gzipped(self, mock_predict_single):
+        sentences = [s for s, _ in REQUIRED_CASES] * 16
+        resp = mock_predict_single.post(
+            "/predict/batch",
+            json={"sentences": sentences},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json()["count"] == len(sentences)
+
     def test_batch_empty_list_returns_422(self, mock_predict_single):
         resp = mock_predict_single.post("/predict/batch", json={"sentences": []})
         assert resp.status_code == 422
@@ -210,6 +248,12 @@ class TestBatchPredict:
         )
         assert resp.status_code == 422
 
+    def test_batch_with_whitespace_only_sentence_returns_422(self, mock_predict_single):
+        resp = mock_predict_single.post(
+            "/predict/batch", json={"sentences": ["valid sentence", "   "]}
+        )
+        assert resp.status_code == 422
+
     def test_batch_single_sentence(self, mock_predict_single):
         resp = mock_predict_single.post(
             "/predict/batch",
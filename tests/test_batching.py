@@ -0,0 +1,159 @@
+"""
+Unit tests for app.batching.MicroBatcher with the inference functions patched.
+
+Run with:
+    pytest tests/test_batching.py -v
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+import app.model as model
+from app.batching import MicroBatcher
+
+# Cached predictions would otherwise leak between tests and skip the stubs.
+pytestmark = pytest.mark.usefixtures("empty_cache")
+
+
+# ---------------------------------------------------------------------------
+# Stubs
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """
+    Patch predict_single / predict_batch to echo each sentence back as its
+    label and record every call as the list of sentences it received.
+    """
+    recorded: list[list[str]] = []
+
+    def _fake_single(sentence):
+        recorded.append([sentence])
+        return {"label": sentence, "score": 0.5}
+
+    def _fake_batch(sentences):
+        recorded.append(list(sentences))
+        return [{"sentence": s, "label": s, "score": 0.5} for s in sentences]
+
+    monkeypatch.setattr(model, "predict_single", _fake_single)
+    monkeypatch.setattr(model, "predict_batch", _fake_batch)
+    return recorded
+
+
+async def _submit_all(batcher, sentences: list[str]) -> list:
+    await batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(s) for s in sentences), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+# ---------------------------------------------------------------------------
+# Batching
+# ---------------------------------------------------------------------------
+
+
+class TestMicroBatcher:
+    def test_results_match_submission_order(self, calls):
+        sentences = [f"sentence {i}" for i in range(10)]
+
+        results = asyncio.run(_submit_all(MicroBatcher(max_wait_ms=50), sentences))
+
+        assert [r["label"] for r in results] == sentences
+        assert all(set(r) == {"label", "score"} for r in results)
+
+    def test_batches_capped_at_max_batch_size(self, calls):
+        sentences = [f"sentence {i}" for i in range(10)]
+
+        asyncio.run(_submit_all(MicroBatcher(max_batch_size=4, max_wait_ms=50), sentences))
+
+        assert [len(c) for c in calls] == [4, 4, 2]
+        assert [s for c in calls for s in c] == sentences
+
+    def test_single_sentence_uses_predict_single(self, calls, monkeypatch):
+        monkeypatch.setattr(model, "predict_batch", None)
+
+        results = asyncio.run(_submit_all(MicroBatcher(), ["only one"]))
+
+        assert results == [{"label": "only one", "score": 0.5}]
+
+    def test_batch_error_reaches_every_future(self, calls, monkeypatch):
+        def _boom(sentences):
+            raise RuntimeError("Model is not loaded.")
+
+        monkeypatch.setattr(model, "predict_batch", _boom)
+        monkeypatch.setattr(model, "predict_single", _boom)
+
+        results = asyncio.run(_submit_all(MicroBatcher(max_wait_ms=50), ["a", "b", "c"]))
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_batch_error_is_isolated_per_sentence(self, calls, monkeypatch):
+        def _fail_batch(sentences):
+            raise ValueError("bad batch")
+
+        def _fail_on_b(sentence):
+            if sentence == "b":
+                raise ValueError("bad sentence")
+            return {"label": sentence, "score": 0.5}
+
+        monkeypatch.setattr(model, "predict_batch", _fail_batch)
+        monkeypatch.setattr(model, "predict_single", _fail_on_b)
+
+        results = asyncio.run(_submit_all(MicroBatcher(max_wait_ms=50), ["a", "b", "c"]))
+
+        assert results[0] == {"label": "a", "score": 0.5}
+        assert isinstance(results[1], ValueError)
+        assert results[2] == {"label": "c", "score": 0.5}
+
+    def test_cache_hits_skip_predict_batch(self, calls):
+        model.cache_prediction("b", {"label": "cached", "score": 0.9})
+
+        results = asyncio.run(_submit_all(MicroBatcher(max_wait_ms=50), ["a", "b", "c"]))
+
+        assert calls == [["a", "c"]]
+        assert [r["label"] for r in results] == ["a", "cached", "c"]
+
+    def test_batched_results_are_cached(self, calls):
+        asyncio.run(_submit_all(MicroBatcher(max_wait_ms=50), ["a", "b"]))
+        asyncio.run(_submit_all(MicroBatcher(max_wait_ms=50), ["a", "b"]))
+
+        assert calls == [["a", "b"]]
+
+    def test_submit_before_start_raises(self):
+        with pytest.raises(RuntimeError):
+            asyncio.run(MicroBatcher().submit("a"))
+
+
+# ---------------------------------------------------------------------------
+# Shutdown
+# ---------------------------------------------------------------------------
+
+
+class TestMicroBatcherStop:
+    def test_stop_resolves_inflight_and_queued_futures(self, monkeypatch):
+        release = threading.Event()
+
+        def _blocking_batch(sentences):
+            release.wait(5)
+            return [{"sentence": s, "label": s, "score": 0.5} for s in sentences]
+
+        monkeypatch.setattr(model, "predict_batch", _blocking_batch)
+
+        async def _scenario():
+            batcher = MicroBatcher(max_batch_size=2, max_wait_ms=50)
+            await batcher.start()
+            # First two form the in-flight batch; the rest stay queued.
+            tasks = [asyncio.create_task(batcher.submit(s)) for s in "abcde"]
+            await asyncio.sleep(0.2)
+            await batcher.stop()
+            release.set()
+            return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=1)
+
+        results = asyncio.run(_scenario())
+
+        assert len(results) == 5
+        assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,324 @@
+"""
+Unit tests for app.model helpers that do not need the real HuggingFace model.
+
+Run with:
+    pytest tests/test_model.py -v
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import onnx
+import pytest
+from onnx import TensorProto, helper
+
+import app.model as model
+
+# ---------------------------------------------------------------------------
+# ONNX backend metadata
+# ---------------------------------------------------------------------------
+
+
+def _save_graph(path, op_type: str) -> str:
+    """Write a one-node ONNX graph using `op_type` and return its path."""
+    graph = helper.make_graph(
+        [helper.make_node(op_type, ["x", "w"], ["y"])],
+        "g",
+        [
+            helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 2]),
+            helper.make_tensor_value_info("w", TensorProto.FLOAT, [2, 2]),
+        ],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 2])],
+    )
+    onnx.save(helper.make_model(graph), str(path))
+    return str(path)
+
+
+class TestOnnxMetadata:
+    def test_int8_graph_is_reported_quantized(self, tmp_path):
+        path = _save_graph(tmp_path / "model.int8.onnx", "MatMulInteger")
+        assert model._onnx_is_quantized(path) is True
+
+    def test_fp32_graph_is_not_reported_quantized(self, tmp_path):
+        path = _save_graph(tmp_path / "model.onnx", "MatMul")
+        assert model._onnx_is_quantized(path) is False
+
+    def test_labels_read_from_config_next_to_graph(self, tmp_path, monkeypatch):
+        (tmp_path / "config.json").write_text("{}")
+        monkeypatch.setattr(model, "ONNX_MODEL_PATH", str(tmp_path / "model.onnx"))
+        assert model._onnx_config_dir() == str(tmp_path)
+
+    def test_labels_fall_back_to_model_name(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(model, "ONNX_MODEL_PATH", str(tmp_path / "model.onnx"))
+        assert model._onnx_config_dir() == model.MODEL_NAME
+
+
+# ---------------------------------------------------------------------------
+# Stubs for the inference path
+# ---------------------------------------------------------------------------
+
+
+class _StubTokenizer:
+    """Reports each sentence's word count as its token length."""
+
+    def __call__(self, sentences, **kwargs):
+        return {"length": [len(s.split()) for s in sentences]}
+
+
+@pytest.fixture
+def stub_torch(monkeypatch):
+    """
+    Stand in for the loaded PyTorch model. `_predict_torch` echoes each
+    sentence back as its label and records every mini-batch it receives.
+    """
+    calls: list[list[str]] = []
+
+    def _fake_predict_torch(sentences, padding):
+        calls.append(list(sentences))
+        return [{"label": s, "score": 0.5} for s in sentences]
+
+    monkeypatch.setattr(model, "_model", object())
+    monkeypatch.setattr(model, "_session", None)
+    monkeypatch.setattr(model, "_tokenizer", _StubTokenizer())
+    monkeypatch.setattr(model, "_predict_torch", _fake_predict_torch)
+    return calls
+
+
+# ---------------------------------------------------------------------------
+# predict_batch — length bucketing
+# ---------------------------------------------------------------------------
+
+
+class TestPredictBatchBucketing:
+    def test_output_matches_input_order_across_chunks(self, stub_torch):
+        # Mixed lengths spread over more than two BATCH_SIZE chunks
+        sentences = [" ".join(["w"] * ((i * 7) % 13 + 1)) + f" #{i}" for i in range(40)]
+
+        results = model.predict_batch(sentences)
+
+        assert len(stub_torch) == -(-len(sentences) // model.BATCH_SIZE)
+        assert [r["sentence"] for r in results] == sentences
+        assert [r["label"] for r in results] == sentences
+
+    def test_chunks_are_length_sorted_and_capped(self, stub_torch):
+        sentences = [" ".join(["w"] * n) for n in (9, 1, 5, 3, 7, 2, 8, 4, 6)] * 4
+
+        model.predict_batch(sentences)
+
+        flat_lengths = [len(s.split()) for chunk in stub_torch for s in chunk]
+        assert flat_lengths == sorted(flat_lengths)
+        assert all(len(chunk) <= model.BATCH_SIZE for chunk in stub_torch)
+
+
+# ---------------------------------------------------------------------------
+# predict_single — LRU cache
+# ---------------------------------------------------------------------------
+
+
+class TestPredictSingleCache:
+    def test_whitespace_variants_share_one_forward_pass(self, stub_torch, empty_cache):
+        first = model.predict_single("a  b")
+        second = model.predict_single("a b")
+
+        assert stub_torch == [["a b"]]
+        assert first == second == {"label": "a b", "score": 0.5}
+
+    def test_distinct_sentences_each_run_forward_pass(self, stub_torch, empty_cache):
+        model.predict_single("a b")
+        model.predict_single("a c")
+        model.predict_single("a b")
+
+        assert stub_torch == [["a b"], ["a c"]]
+
+    def test_batched_predictions_are_served_from_cache(self, stub_torch, empty_cache):
+        model.cache_prediction("a  b", {"label": "cached", "score": 0.9})
+
+        assert model.cached_prediction("a b") == {"label": "cached", "score": 0.9}
+        assert model.predict_single("a b") == {"label": "cached", "score": 0.9}
+        assert stub_torch == []
+
+    def test_cache_evicts_least_recently_used(self, stub_torch, empty_cache, monkeypatch):
+        monkeypatch.setattr(model, "CACHE_SIZE", 2)
+        model.predict_single("a")
+        model.predict_single("b")
+        model.predict_single("a")  # refresh "a" so "b" is the eviction candidate
+        model.predict_single("c")
+
+        assert model.cached_prediction("a") is not None
+        assert model.cached_prediction("b") is None
+
+
+# ---------------------------------------------------------------------------
+# Concurrency — tokenizer and model are shared across worker threads
+# ---------------------------------------------------------------------------
+
+
+class _Exclusive:
+    """Raises like the HF fast tokenizer when entered from two threads at once."""
+
+    def __init__(self):
+        self._busy = threading.Lock()
+
+    def __enter__(self):
+        if not self._busy.acquire(blocking=False):
+            raise RuntimeError("Already borrowed")
+        time.sleep(0.001)  # widen the race window
+
+    def __exit__(self, *exc):
+        self._busy.release()
+
+
+@pytest.fixture
+def exclusive_torch(stub_torch, monkeypatch):
+    """stub_torch whose tokenizer and forward pass fail on concurrent use."""
+    guard = _Exclusive()
+    tokenize, forward = model._tokenizer, model._predict_torch
+
+    def _tokenizer(sentences, **kwargs):
+        with guard:
+            return tokenize(sentences, **kwargs)
+
+    def _predict_torch(sentences, padding):
+        with guard:
+            return forward(sentences, padding)
+
+    monkeypatch.setattr(model, "_tokenizer", _tokenizer)
+    monkeypatch.setattr(model, "_predict_torch", _predict_torch)
+
+
+class TestConcurrentInference:
+    def test_concurrent_batch_and_single_calls_are_serialised(self, exclusive_torch, empty_cache):
+        def _call(i):
+            if i % 3 == 0:
+                return model.predict_single(f"single {i}")
+            return model.predict_batch([f"batch {i} {n}" for n in range(20)])
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(_call, range(64)))
+
+        assert len(results) == 64
+
+
+# ---------------------------------------------------------------------------
+# get_model_info
+# ---------------------------------------------------------------------------
+
+
+class TestGetModelInfo:
+    def test_labels_come_from_loaded_config(self, monkeypatch):
+        monkeypatch.setattr(model, "_labels", ("NEG", "POS"))
+        assert model.get_model_info()["labels"] == ["NEG", "POS"]
+
+
+# ---------------------------------------------------------------------------
+# ONNX execution providers
+# ---------------------------------------------------------------------------
+
+ALL_PROVIDERS = [
+    "TensorrtExecutionProvider",
+    "CUDAExecutionProvider",
+    "OpenVINOExecutionProvider",
+    "CPUExecutionProvider",
+]
+
+
+def _provider_names(providers: list) -> list[str]:
+    return [p[0] if isinstance(p, tuple) else p for p in providers]
+
+
+@pytest.fixture
+def provider_env(monkeypatch):
+    """Set USE_TRT / USE_OPENVINO / CUDA availability for _onnx_providers."""
+
+    def _set(trt=False, openvino=False, cuda=False):
+        monkeypatch.setattr(model, "USE_TRT", trt)
+        monkeypatch.setattr(model, "USE_OPENVINO", openvino)
+        monkeypatch.setattr(model, "_CUDA_AVAILABLE", cuda)
+
+    return _set
+
+
+class TestOnnxProviders:
+    def test_default_is_cpu_only(self, provider_env):
+        provider_env()
+        assert model._onnx_providers(ALL_PROVIDERS) == ["CPUExecutionProvider"]
+
+    def test_trt_with_cuda(self, provider_env):
+        provider_env(trt=True, cuda=True)
+        providers = model._onnx_providers(ALL_PROVIDERS)
+
+        assert _provider_names(providers) == [
+            "TensorrtExecutionProvider",
+            "CUDAExecutionProvider",
+            "CPUExecutionProvider",
+        ]
+        assert providers[0][1]["trt_engine_cache_path"] == model.TRT_ENGINE_CACHE_PATH
+
+    def test_trt_without_cuda_warns_and_falls_back(self, provider_env, caplog):
+        provider_env(trt=True, cuda=False)
+        with caplog.at_level("WARNING", logger=model.logger.name):
+            providers = model._onnx_providers(ALL_PROVIDERS)
+
+        assert providers == ["CPUExecutionProvider"]
+        assert "USE_TRT" in caplog.text
+
+    def test_openvino(self, provider_env):
+        provider_env(openvino=True)
+        providers = model._onnx_providers(ALL_PROVIDERS)
+
+        assert _provider_names(providers) == ["OpenVINOExecutionProvider", "CPUExecutionProvider"]
+
+    def test_missing_provider_is_skipped(self, provider_env, caplog):
+        provider_env(trt=True, cuda=True)
+        with caplog.at_level("WARNING", logger=model.logger.name):
+            providers = model._onnx_providers(["CUDAExecutionProvider", "CPUExecutionProvider"])
+
+        assert _provider_names(providers) == ["CUDAExecutionProvider", "CPUExecutionProvider"]
+        assert "TensorrtExecutionProvider is not available" in caplog.text
+
+
+# ---------------------------------------------------------------------------
+# torch.compile fallback
+# ---------------------------------------------------------------------------
+
+
+class _Encoding(dict):
+    def to(self, device):
+        return self
+
+
+class _StubClassifier:
+    config = type("Config", (), {"num_labels": 1, "id2label": {0: "PRESENT"}})()
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+
+class TestTorchCompileFallback:
+    def test_compile_failure_keeps_eager_model(self, monkeypatch):
+        eager = _StubClassifier()
+
+        def _failing_compile(m, **kwargs):
+            def _raise(**enc):
+                raise RuntimeError("inductor: no C++ compiler")
+
+            return _raise
+
+        monkeypatch.setattr(
+            model.AutoModelForSequenceClassification, "from_pretrained", lambda name: eager
+        )
+        monkeypatch.setattr(model.torch, "compile", _failing_compile)
+        monkeypatch.setattr(model, "TORCH_COMPILE", True)
+        monkeypatch.setattr(model, "QUANTIZE", False)
+        monkeypatch.setattr(model, "USE_IPEX", False)
+        monkeypatch.setattr(model, "_model", None)
+        monkeypatch.setattr(model, "_tokenizer", None)
+        monkeypatch.setattr(model, "_labels", ())
+
+        model._load_torch_model(lambda *args, **kwargs: _Encoding())
+
+        assert model._model is eager
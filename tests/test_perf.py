@@ -0,0 +1,72 @@
+"""
+Latency regression tests against the real (quantized) model.
+
+These load the actual HuggingFace model, so they are opt-in:
+    RUN_PERF_TESTS=1 pytest tests/test_perf.py -v
+    RUN_PERF_TESTS=1 PERF_LATENCY_MS=250 pytest -m perf
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.test_api import REQUIRED_CASES
+
+PERF_LATENCY_MS = float(os.getenv("PERF_LATENCY_MS", "500"))
+
+pytestmark = [
+    pytest.mark.perf,
+    pytest.mark.skipif(
+        os.getenv("RUN_PERF_TESTS") != "1",
+        reason="set RUN_PERF_TESTS=1 to run latency tests against the real model",
+    ),
+]
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="session")
+def real_client():
+    """TestClient backed by the real model — nothing in app.model is patched."""
+    import app.main
+    import app.model
+
+    with TestClient(app.main.app) as client:
+        # Measure real forward passes, not LRU hits from warmup or earlier runs.
+        app.model.clear_cache()
+        yield client
+
+
+# ---------------------------------------------------------------------------
+# Latency
+# ---------------------------------------------------------------------------
+
+
+class TestPredictLatency:
+    @pytest.mark.parametrize("sentence,expected_label", REQUIRED_CASES)
+    def test_predict_under_threshold(self, real_client, sentence, expected_label):
+        resp = real_client.post("/predict", json={"sentence": sentence})
+        assert resp.status_code == 200
+        assert resp.json()["label"] == expected_label
+
+        elapsed_ms = float(resp.headers["X-Process-Time-Ms"])
+        assert elapsed_ms < PERF_LATENCY_MS, (
+            f"/predict took {elapsed_ms:.1f} ms for {sentence!r} "
+            f"(threshold {PERF_LATENCY_MS:.0f} ms)"
+        )
+
+    def test_batch_under_threshold(self, real_client):
+        sentences = [s for s, _ in REQUIRED_CASES]
+        resp = real_client.post("/predict/batch", json={"sentences": sentences})
+        assert resp.status_code == 200
+        assert resp.json()["count"] == len(sentences)
+
+        elapsed_ms = float(resp.headers["X-Process-Time-Ms"])
+        assert elapsed_ms < PERF_LATENCY_MS, (
+            f"/predict/batch took {elapsed_ms:.1f} ms for {len(sentences)} sentences "
+            f"(threshold {PERF_LATENCY_MS:.0f} ms)"
+        )